@@ -5,12 +5,42 @@ import os
 import sys
 import time
 import argparse
+import re
 from pathlib import Path
 from src.document_processor import DocumentProcessor
 from src.persona_analyzer import PersonaAnalyzer
 from src.relevance_scorer import RelevanceScorer
 from src.output_formatter import OutputFormatter
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_COLLECTION_RE = re.compile(r'collection\s*(\d+)', re.IGNORECASE)
+
+def _derive_collection_name(*folder_names):
+    for folder_name in folder_names:
+        match = _COLLECTION_RE.search(folder_name or '')
+        if match:
+            return f"collection_{match.group(1)}"
+    return "analysis"
+
+def _load_json(path):
+    if orjson:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _dump_json(data, path):
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 class DocumentIntelligenceSystem:
     def __init__(self):
         print("Initializing Document Intelligence System...")
@@ -28,8 +58,7 @@ class DocumentIntelligenceSystem:
         try:
             if config_file and os.path.exists(config_file):
                 print(f"Loading configuration from: {config_file}")
-                with open(config_file, 'r') as f:
-                    input_config = json.load(f)
+                input_config = _load_json(config_file)
                 
                 persona_role = input_config.get('persona', {}).get('role', persona_role)
                 job_task = input_config.get('job_to_be_done', {}).get('task', job_task)
@@ -65,22 +94,20 @@ class DocumentIntelligenceSystem:
             print(f"  - Task: {job_task}")
             print(f"  - PDF Folder: {pdf_folder}")
             
-            print(f"Loading PDFs from {pdf_folder}...")
-            documents = self.doc_processor.load_pdfs(pdf_folder)
-            
-            if not documents:
-                print("Error: No PDF documents found")
-                return None
-            
-            print(f"Loaded {len(documents)} documents")
-            
-            print("Extracting sections from documents...")
+            print(f"Loading PDFs from {pdf_folder} and extracting sections...")
             all_sections = []
-            for doc in documents:
+            document_count = 0
+            for doc in self.doc_processor.iter_pdfs(pdf_folder):
+                document_count += 1
                 sections = self.doc_processor.extract_sections(doc)
                 all_sections.extend(sections)
                 print(f"  - {doc['filename']}: {len(sections)} sections")
             
+            if not document_count:
+                print("Error: No PDF documents found")
+                return None
+            
+            print(f"Loaded {document_count} documents")
             print(f"Total sections extracted: {len(all_sections)}")
             
             if not all_sections:
@@ -116,40 +143,28 @@ class DocumentIntelligenceSystem:
             
             if not output_file:
                 outputs_dir = "Outputs"
-                if not os.path.exists(outputs_dir):
-                    os.makedirs(outputs_dir)
-                
-                collection_name = "analysis"
-                import re
+                os.makedirs(outputs_dir, exist_ok=True)
                 
                 if config_file:
-                    config_dir = os.path.dirname(config_file)
-                    config_folder = os.path.basename(config_dir)
-                    if 'collection' in config_folder.lower():
-                        match = re.search(r'collection\s*(\d+)', config_folder.lower())
-                        if match:
-                            collection_name = f"collection_{match.group(1)}"
+                    collection_name = _derive_collection_name(
+                        os.path.basename(os.path.dirname(config_file))
+                    )
                 elif pdf_folder:
-                    folder_name = os.path.basename(pdf_folder.rstrip('/\\'))
-                    if 'collection' in folder_name.lower():
-                        match = re.search(r'collection\s*(\d+)', folder_name.lower())
-                        if match:
-                            collection_name = f"collection_{match.group(1)}"
-                    else:
-                        parent_folder = os.path.basename(os.path.dirname(pdf_folder))
-                        if 'collection' in parent_folder.lower():
-                            match = re.search(r'collection\s*(\d+)', parent_folder.lower())
-                            if match:
-                                collection_name = f"collection_{match.group(1)}"
+                    folder_path = pdf_folder.rstrip('/\\')
+                    collection_name = _derive_collection_name(
+                        os.path.basename(folder_path),
+                        os.path.basename(os.path.dirname(folder_path))
+                    )
+                else:
+                    collection_name = "analysis"
                 
                 output_file = os.path.join(outputs_dir, f"{collection_name}_output.json")
             else:
                 output_dir = os.path.dirname(output_file)
-                if output_dir and not os.path.exists(output_dir):
-                    os.makedirs(output_dir)
+                if output_dir:
+                    os.makedirs(output_dir, exist_ok=True)
             
-            with open(output_file, 'w') as f:
-                json.dump(output_data, f, indent=2)
+            _dump_json(output_data, output_file)
             
             processing_time = time.time() - start_time
             print(f"Processing completed successfully in {processing_time:.2f} seconds")
@@ -1,22 +1,120 @@
 import fitz
 import re
 import os
-from typing import List, Dict, Any, Optional
+import multiprocessing
+from typing import List, Dict, Any, Optional, Set, Tuple, Iterator
+
+MIN_PARALLEL_FILES = 4
+HEADER_SIZE_RATIO = 1.15
+
+_BOLD_FLAG = 2 ** 4
+
+_WS_RE = re.compile(r'\s+')
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_SENT_END_RE = re.compile(r'[.!?]\s+')
+_TEXT_TRANS = str.maketrans({
+    **{chr(c): ' ' if chr(c).isspace() else None
+       for c in [*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20), *range(0x7f, 0x100)]},
+    '\ufb00': 'ff', '\ufb01': 'fi', '\ufb02': 'fl', '\ufb03': 'ffi', '\ufb04': 'ffl',
+    '\ufb05': 'st', '\ufb06': 'st',
+})
+_BULLET_STARTS = ('•', '-', '*')
+_CONTINUATION_ENDINGS = (' and', ' or', ' with', ' to', ' for', ' of', ' in', ' on')
+
+def _load_one_pdf(filepath: str) -> Optional[Dict[str, Any]]:
+    try:
+        doc = fitz.open(filepath)
+    
+        if len(doc) == 0:
+            print(f"Warning: {os.path.basename(filepath)} appears to be empty")
+            doc.close()
+            return None
+    
+        pages = []
+        total_text_length = 0
+    
+        for page_num in range(len(doc)):
+            page = doc.load_page(page_num)
+            layout_lines = _extract_layout_lines(page)
+            text = ' '.join(line[0] for line in layout_lines)
+    
+            cleaned_text = _clean_extracted_text(text)
+            total_text_length += len(cleaned_text)
+    
+            pages.append({
+                'page_number': page_num + 1,
+                'text': cleaned_text,
+                'char_count': len(cleaned_text),
+                'layout_lines': layout_lines
+            })
+    
+        doc.close()
+        fitz.TOOLS.store_shrink(100)
+    
+        if total_text_length < 100:
+            print(f"Warning: {os.path.basename(filepath)} has very little text content")
+            return None
+    
+        return {
+            'filename': os.path.basename(filepath),
+            'filepath': filepath,
+            'pages': pages,
+            'total_pages': len(pages),
+            'total_chars': total_text_length,
+            'avg_chars_per_page': total_text_length / len(pages) if pages else 0
+        }
+    
+    except Exception as e:
+        print(f"Error loading {os.path.basename(filepath)}: {e}")
+        return None
+
+def _extract_layout_lines(page) -> List[Tuple[str, float, bool]]:
+    layout_lines = []
+    
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT)['blocks']:
+        for line in block.get('lines', []):
+            spans = [span for span in line['spans'] if span['text'].strip()]
+            if not spans:
+                continue
+            
+            text = ''.join(span['text'] for span in line['spans'])
+            size = min(span['size'] for span in spans)
+            bold = all(span['flags'] & _BOLD_FLAG for span in spans)
+            layout_lines.append((text, size, bold))
+    
+    return layout_lines
+
+def _first_sentences(text: str, max_sentences: int) -> List[str]:
+    sentences = []
+    start = 0
+    
+    for match in _SENT_END_RE.finditer(text):
+        sentences.append(text[start:match.start() + 1])
+        start = match.end()
+        if len(sentences) == max_sentences:
+            return sentences
+    
+    sentences.append(text[start:])
+    return sentences
+
+def _count_words(text: str) -> int:
+    # only valid for single-spaced text, i.e. the output of _clean_text
+    return text.count(' ') + 1 if text else 0
+
+def _clean_extracted_text(text: str) -> str:
+    if not text:
+        return ""
+    
+    text = _WS_RE.sub(' ', text.translate(_TEXT_TRANS)).strip()
+    
+    if len(text) < 3 or (len(text) == 3 and text.isdecimal()):
+        return ""
+    
+    return text
+
 
 class DocumentProcessor:
-    def __init__(self, custom_patterns: Optional[List[str]] = None):
-        default_patterns = [
-            r'^[A-Z][A-Za-z\s]{15,80}$',
-            r'^[A-Z][A-Z\s]{8,60}$',
-            r'^(Introduction|Overview|Summary|Conclusion|Background|Methods?|Results?|Discussion|Analysis|Recommendations?)\s*:?\s*[A-Za-z\s]*$',
-            r'^(Chapter|Section|Part|Step)\s+\d+:?\s*[A-Z][A-Za-z\s]{5,50}$',
-            r'^\d+(\.\d+)*\s+[A-Z][A-Za-z\s]{10,60}$',
-            r'^(Key|Main|Important|Essential|Critical|Primary|Secondary)\s+[A-Za-z\s]{10,50}$',
-            r'^(What|How|Why|When|Where|Which)\s+[A-Za-z\s]{10,60}\??$',
-        ]
-        
-        self.section_patterns = custom_patterns if custom_patterns else default_patterns
-        
+    def __init__(self):
         self.stop_words = {
             'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
             'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
@@ -25,27 +123,33 @@ class DocumentProcessor:
         }
     
     def load_pdfs(self, pdf_path: str, recursive: bool = False) -> List[Dict[str, Any]]:
-        documents = []
-        
+        return list(self.iter_pdfs(pdf_path, recursive))
+    
+    def iter_pdfs(self, pdf_path: str, recursive: bool = False) -> Iterator[Dict[str, Any]]:
         if not os.path.exists(pdf_path):
             print(f"Warning: Path '{pdf_path}' does not exist")
-            return documents
+            return
         
         if os.path.isfile(pdf_path) and pdf_path.lower().endswith('.pdf'):
-            doc_data = self._load_single_pdf(pdf_path)
+            doc_data = _load_one_pdf(pdf_path)
             if doc_data:
-                documents.append(doc_data)
-            return documents
+                yield doc_data
+            return
         
         if os.path.isdir(pdf_path):
             pdf_files = self._find_pdf_files(pdf_path, recursive)
             
-            for filepath in pdf_files:
-                doc_data = self._load_single_pdf(filepath)
-                if doc_data:
-                    documents.append(doc_data)
-        
-        return documents
+            workers = min(multiprocessing.cpu_count(), len(pdf_files))
+            if workers > 1 and len(pdf_files) >= MIN_PARALLEL_FILES:
+                with multiprocessing.Pool(processes=workers) as pool:
+                    for doc_data in pool.imap(_load_one_pdf, pdf_files):
+                        if doc_data:
+                            yield doc_data
+            else:
+                for filepath in pdf_files:
+                    doc_data = _load_one_pdf(filepath)
+                    if doc_data:
+                        yield doc_data
     
     def _find_pdf_files(self, folder_path: str, recursive: bool = False) -> List[str]:
         pdf_files = []
@@ -57,83 +161,15 @@ class DocumentProcessor:
                         if filename.lower().endswith('.pdf'):
                             pdf_files.append(os.path.join(root, filename))
             else:
-                for filename in os.listdir(folder_path):
-                    if filename.lower().endswith('.pdf'):
-                        pdf_files.append(os.path.join(folder_path, filename))
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                            pdf_files.append(entry.path)
         except Exception as e:
             print(f"Error scanning folder {folder_path}: {e}")
         
         return sorted(pdf_files)
     
-    def _load_single_pdf(self, filepath: str) -> Optional[Dict[str, Any]]:
-        try:
-            doc = fitz.open(filepath)
-            
-            if len(doc) == 0:
-                print(f"Warning: {os.path.basename(filepath)} appears to be empty")
-                doc.close()
-                return None
-            
-            pages = []
-            total_text_length = 0
-            
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text = page.get_text()
-                
-                cleaned_text = self._clean_extracted_text(text)
-                total_text_length += len(cleaned_text)
-                
-                pages.append({
-                    'page_number': page_num + 1,
-                    'text': cleaned_text,
-                    'char_count': len(cleaned_text)
-                })
-            
-            doc.close()
-            
-            if total_text_length < 100:
-                print(f"Warning: {os.path.basename(filepath)} has very little text content")
-                return None
-            
-            return {
-                'filename': os.path.basename(filepath),
-                'filepath': filepath,
-                'pages': pages,
-                'total_pages': len(pages),
-                'total_chars': total_text_length,
-                'avg_chars_per_page': total_text_length / len(pages) if pages else 0
-            }
-            
-        except Exception as e:
-            print(f"Error loading {os.path.basename(filepath)}: {e}")
-            return None
-    
-    def _clean_extracted_text(self, text: str) -> str:
-        if not text:
-            return ""
-        
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]', '', text)
-        
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if re.match(r'^\d+$', line) and len(line) <= 3:
-                continue
-                
-            if len(line) < 3:
-                continue
-                
-            cleaned_lines.append(line)
-        
-        return ' '.join(cleaned_lines).strip()
-    
     def extract_sections(self, document: Dict[str, Any], min_content_length: int = 50) -> List[Dict[str, Any]]:
         sections = []
         
@@ -142,21 +178,15 @@ class DocumentProcessor:
             if not page_text.strip():
                 continue
             
-            page_sections = []
+            page_sections = self._extract_sections_by_layout(document, page)
             
-            lines = page_text.split('\n')
-            page_sections.extend(self._extract_sections_by_lines(lines, document, page))
-            
-            if len(page_sections) < 2:
-                paragraphs = self._split_into_paragraphs(page_text)
-                page_sections.extend(self._extract_sections_by_paragraphs(paragraphs, document, page))
-            
-            if len(page_sections) == 0:
-                page_sections.extend(self._extract_fallback_sections(page_text, document, page))
+            if not page_sections:
+                page_sections = self._extract_fallback_sections(page_text, document, page)
             
             for section in page_sections:
-                if (section.get('content', '') and 
-                    len(section['content']) >= min_content_length and
+                content = section.get('content', '')
+                if (content and 
+                    len(content) >= min_content_length and
                     self._is_valid_section(section)):
                     sections.append(section)
         
@@ -164,60 +194,70 @@ class DocumentProcessor:
         
         return sections
     
-    def _extract_sections_by_lines(self, lines: List[str], document: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_sections_by_layout(self, document: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
+        layout_lines = page.get('layout_lines')
+        if not layout_lines:
+            return []
+        
+        sizes = sorted(size for _, size, _ in layout_lines)
+        median_size = sizes[len(sizes) // 2]
+        
+        header_flags = [self._is_layout_header(text, size, bold, median_size)
+                        for text, size, bold in layout_lines]
+        if all(header_flags):
+            return []
+        
         sections = []
+        title = None
+        content_lines = []
         
-        for i, line in enumerate(lines):
-            line = line.strip()
+        for (text, _, _), is_header in zip(layout_lines, header_flags):
+            line = _clean_extracted_text(text)
             if not line:
                 continue
             
-            if self._is_proper_section_header(line, lines, i):
-                content = self._extract_section_content(lines, i)
-                
-                if content:
-                    sections.append({
-                        'document': document['filename'],
-                        'page_number': page['page_number'],
-                        'section_title': line,
-                        'content': content,
-                        'word_count': len(content.split()),
-                        'extraction_method': 'line_analysis'
-                    })
+            if is_header and title and not content_lines and (
+                    title.lower().endswith(_CONTINUATION_ENDINGS) or not line[0].isupper()):
+                title = f"{title} {line}"
+            elif is_header and (line[0].isupper() or line[0].isdigit()):
+                if title and content_lines:
+                    sections.append(self._build_layout_section(document, page, title, content_lines))
+                title = line
+                content_lines = []
+            elif title:
+                content_lines.append(line)
+        
+        if title and content_lines:
+            sections.append(self._build_layout_section(document, page, title, content_lines))
         
         return sections
     
-    def _extract_sections_by_paragraphs(self, paragraphs: List[str], document: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
-        sections = []
+    def _is_layout_header(self, text: str, size: float, bold: bool, median_size: float) -> bool:
+        line = text.strip()
+        if len(line) < 3 or len(line) > 150:
+            return False
         
-        for i, paragraph in enumerate(paragraphs):
-            if not paragraph.strip():
-                continue
-            
-            lines = paragraph.split('\n')
-            first_line = lines[0].strip()
-            
-            if (len(lines) > 1 and 
-                self._could_be_section_header(first_line) and
-                len(first_line) < 100):
-                
-                content = '\n'.join(lines[1:]).strip()
-                if len(content) > 30:
-                    sections.append({
-                        'document': document['filename'],
-                        'page_number': page['page_number'],
-                        'section_title': first_line,
-                        'content': content,
-                        'word_count': len(content.split()),
-                        'extraction_method': 'paragraph_analysis'
-                    })
+        if line.endswith((':', '.')):
+            return False
         
-        return sections
+        return bold or size >= median_size * HEADER_SIZE_RATIO
+    
+    def _build_layout_section(self, document: Dict[str, Any], page: Dict[str, Any], title: str, content_lines: List[str]) -> Dict[str, Any]:
+        content = self._clean_text(' '.join(content_lines))
+        
+        return {
+            'document': document['filename'],
+            'page_number': page['page_number'],
+            'section_title': title,
+            'content': content,
+            'word_count': _count_words(content),
+            'extraction_method': 'layout_analysis'
+        }
     
     def _extract_fallback_sections(self, page_text: str, document: Dict[str, Any], page: Dict[str, Any]) -> List[Dict[str, Any]]:
         sections = []
         
-        sentences = re.split(r'(?<=[.!?])\s+', page_text)
+        sentences = _SENT_SPLIT_RE.split(page_text)
         
         current_chunk = []
         chunk_size = 0
@@ -232,26 +272,7 @@ class DocumentProcessor:
             chunk_size += len(sentence)
             
             if chunk_size >= 200 or len(current_chunk) >= 5:
-                content = ' '.join(current_chunk)
-                
-                first_sentence = current_chunk[0]
-                if len(first_sentence) > 100:
-                    title_words = first_sentence.split()[:8]
-                    title = ' '.join(title_words) + '...'
-                else:
-                    title = first_sentence
-                
-                if title.endswith('.'):
-                    title = title[:-1]
-                
-                sections.append({
-                    'document': document['filename'],
-                    'page_number': page['page_number'],
-                    'section_title': title,
-                    'content': content,
-                    'word_count': len(content.split()),
-                    'extraction_method': 'fallback_chunking'
-                })
+                sections.append(self._build_fallback_section(document, page, current_chunk))
                 
                 current_chunk = []
                 chunk_size = 0
@@ -261,55 +282,30 @@ class DocumentProcessor:
                     break
         
         if current_chunk and chunk_size >= 100:
-            content = ' '.join(current_chunk)
-            first_sentence = current_chunk[0]
-            
-            if len(first_sentence) > 100:
-                title_words = first_sentence.split()[:8]
-                title = ' '.join(title_words) + '...'
-            else:
-                title = first_sentence
-                
-            if title.endswith('.'):
-                title = title[:-1]
-            
-            sections.append({
-                'document': document['filename'],
-                'page_number': page['page_number'],
-                'section_title': title,
-                'content': content,
-                'word_count': len(content.split()),
-                'extraction_method': 'fallback_chunking'
-            })
+            sections.append(self._build_fallback_section(document, page, current_chunk))
         
         return sections
     
-    def _split_into_paragraphs(self, text: str) -> List[str]:
-        paragraphs = re.split(r'\n\s*\n', text)
-        
-        if len(paragraphs) < 3:
-            paragraphs = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
-        
-        return [p.strip() for p in paragraphs if p.strip()]
-    
-    def _could_be_section_header(self, line: str) -> bool:
-        if not line or len(line) < 5 or len(line) > 150:
-            return False
-        
-        has_title_case = line.istitle()
-        has_caps = any(c.isupper() for c in line)
-        starts_with_cap = line[0].isupper()
-        has_colon = ':' in line
-        
-        header_indicators = [
-            'introduction', 'overview', 'summary', 'conclusion', 'background',
-            'method', 'result', 'discussion', 'analysis', 'recommendation',
-            'key', 'main', 'important', 'essential', 'step', 'tip', 'guide'
-        ]
-        
-        has_header_words = any(word.lower() in line.lower() for word in header_indicators)
-        
-        return (starts_with_cap and (has_title_case or has_caps or has_colon or has_header_words))
+    def _build_fallback_section(self, document: Dict[str, Any], page: Dict[str, Any], chunk: List[str]) -> Dict[str, Any]:
+        content = ' '.join(chunk)
+        
+        first_sentence = chunk[0]
+        if len(first_sentence) > 100:
+            title = ' '.join(first_sentence.split(None, 8)[:8]) + '...'
+        else:
+            title = first_sentence
+        
+        if title.endswith('.'):
+            title = title[:-1]
+        
+        return {
+            'document': document['filename'],
+            'page_number': page['page_number'],
+            'section_title': title,
+            'content': content,
+            'word_count': len(content.split()),
+            'extraction_method': 'fallback_chunking'
+        }
     
     def _is_valid_section(self, section: Dict[str, Any]) -> bool:
         title = section.get('section_title', '')
@@ -318,10 +314,13 @@ class DocumentProcessor:
         if not title or len(title) < 5 or len(title) > 200:
             return False
         
-        if not content or len(content.split()) < 5:
+        if not content:
             return False
         
         words = content.split()
+        if len(words) < 5:
+            return False
+        
         if len(words) > 5 and all(len(word) < 15 for word in words[:10]):
             avg_word_length = sum(len(word) for word in words[:10]) / 10
             if avg_word_length < 4:
@@ -335,6 +334,7 @@ class DocumentProcessor:
         
         unique_sections = []
         seen_titles = set()
+        seen_word_sets = []
         
         for section in sections:
             title = section['section_title'].lower().strip()
@@ -342,144 +342,33 @@ class DocumentProcessor:
             if title in seen_titles:
                 continue
             
-            is_similar = False
-            for seen_title in seen_titles:
-                if self._titles_are_similar(title, seen_title):
-                    is_similar = True
-                    break
+            words = set(title.split())
+            if words and any(self._word_sets_are_similar(words, seen) for seen in seen_word_sets):
+                continue
             
-            if not is_similar:
-                unique_sections.append(section)
-                seen_titles.add(title)
+            unique_sections.append(section)
+            seen_titles.add(title)
+            seen_word_sets.append(words)
         
         return unique_sections
     
-    def _titles_are_similar(self, title1: str, title2: str, threshold: float = 0.8) -> bool:
-        if not title1 or not title2:
-            return False
-        
-        words1 = set(title1.lower().split())
-        words2 = set(title2.lower().split())
-        
+    def _word_sets_are_similar(self, words1: Set[str], words2: Set[str], threshold: float = 0.8) -> bool:
         if not words1 or not words2:
             return False
         
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        similarity = intersection / union if union > 0 else 0
-        return similarity >= threshold
-    
-    def _is_proper_section_header(self, line: str, all_lines: List[str], index: int) -> bool:
-        if len(line) < 5 or len(line) > 200:
-            return False
-        
-        if line.lower().startswith(('to ', 'for ', 'with ', 'during ', 'whether ', 'and ', 'or ', 'but ', 'the ', 'this ', 'it ', 'a ', 'an ')):
-            return False
-        
-        if line.lower().endswith((' and', ' or', ' with', ' to', ' for', ' of', ' in', ' on')):
-            return False
-        
-        if not (line[0].isupper() or line[0].isdigit()):
-            return False
-        
-        for pattern in self.section_patterns:
-            if re.match(pattern, line):
-                return self._validate_as_header(line, all_lines, index)
-        
-        words = line.split()
-        if len(words) >= 1:
-            if len(words) == 1 and len(line) >= 5 and line.istitle():
-                return self._validate_as_header(line, all_lines, index)
-            
-            if (line.istitle() and 
-                not line.endswith('.') and 
-                not line.startswith('•') and
-                len(line) >= 10):
-                return self._validate_as_header(line, all_lines, index)
-            
-            structural_words = [
-                'overview', 'introduction', 'summary', 'conclusion', 'background',
-                'analysis', 'discussion', 'results', 'findings', 'recommendations',
-                'key', 'main', 'important', 'essential', 'primary', 'secondary',
-                'step', 'phase', 'stage', 'part', 'section', 'chapter',
-                'guide', 'tips', 'methods', 'approach', 'strategy', 'process',
-                'cities', 'cuisine', 'history', 'restaurants', 'hotels', 'things',
-                'tricks', 'traditions', 'culture', 'activities', 'attractions'
-            ]
-            
-            if (any(word.lower() in line.lower() for word in structural_words) and
-                len(words) <= 12 and
-                line[0].isupper()):
-                return self._validate_as_header(line, all_lines, index)
-            
-            if (line.isupper() and 
-                len(words) <= 10 and 
-                len(line) <= 100):
-                return self._validate_as_header(line, all_lines, index)
-            
-            if (len(words) >= 2 and 
-                len(words) <= 8 and
-                line[0].isupper() and
-                not line.endswith('.') and
-                any(c.isupper() for c in line[1:])):
-                return self._validate_as_header(line, all_lines, index)
-        
-        return False
-    
-    def _validate_as_header(self, line: str, all_lines: List[str], index: int) -> bool:
-        following_content = ""
-        content_lines = 0
-        
-        for i in range(index + 1, min(index + 8, len(all_lines))):
-            if i < len(all_lines):
-                line_content = all_lines[i].strip()
-                if line_content:
-                    following_content += " " + line_content
-                    content_lines += 1
-        
-        if len(following_content.strip()) < 15 or content_lines < 1:
-            return False
-        
-        next_line = all_lines[index + 1].strip() if index + 1 < len(all_lines) else ""
-        if next_line:
-            if (len(next_line) > 10 and
-                len(next_line) < 100 and
-                (next_line.istitle() or next_line.isupper()) and
-                not next_line.lower().startswith(('the ', 'this ', 'it ', 'you ', 'a ', 'an ', 'in ', 'on ', 'at ', 'to '))):
-                words = next_line.split()
-                if len(words) <= 6 and not next_line.endswith('.'):
-                    return False
-        
-        return True
-    
-    def _extract_section_content(self, lines: List[str], header_index: int) -> str:
-        content_lines = []
-        
-        for i in range(header_index + 1, min(header_index + 15, len(lines))):
-            line = lines[i].strip()
-            if not line:
-                continue
-            
-            if (len(line) > 15 and
-                (line.istitle() or line.isupper()) and
-                not line.lower().startswith(('the ', 'this ', 'it ', 'you ', 'a ', 'an '))):
-                break
-            
-            content_lines.append(line)
-            
-            if len(' '.join(content_lines)) > 200:
-                break
+        intersection = len(words1 & words2)
+        union = len(words1) + len(words2) - intersection
         
-        return self._clean_text(' '.join(content_lines))
+        return intersection / union >= threshold
     
     def _clean_text(self, text: str) -> str:
         if not text:
             return ""
         
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         text = text.strip()
-        text = re.sub(r'^[•\-\*]\s*', '', text)
+        if text.startswith(_BULLET_STARTS):
+            text = text[1:].lstrip()
         
         return text
     
@@ -494,10 +383,9 @@ class DocumentProcessor:
                 continue
             
             if len(content) > 300:
-                sentences = re.split(r'(?<=[.!?])\s+', content)
+                sentences = _first_sentences(content, 3)
                 if len(sentences) >= 2:
-                    selected = sentences[:3] if len(sentences) >= 3 else sentences[:2]
-                    refined_text = ' '.join(selected)
+                    refined_text = ' '.join(sentences)
                 else:
                     refined_text = content[:300]
                     last_space = refined_text.rfind(' ')
@@ -1,6 +1,5 @@
-import json
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 
 class OutputFormatter:
@@ -45,8 +44,7 @@ class OutputFormatter:
                     input_documents.append(filename)
         
         if not input_documents and ranked_sections:
-            input_documents = list(set(section.get('document', 'Unknown') for section in ranked_sections))
-            input_documents.sort()
+            input_documents = sorted({section.get('document', 'Unknown') for section in ranked_sections})
         
         return input_documents
     
@@ -72,7 +70,7 @@ class OutputFormatter:
             "document_count": len(input_documents),
             "persona": persona_role,
             "job_to_be_done": job_task,
-            "processing_timestamp": datetime.now().isoformat() + "Z",
+            "processing_timestamp": datetime.now(timezone.utc).replace(tzinfo=None).isoformat() + "Z",
             "processing_time_seconds": round(processing_time, 2),
             "system_version": "2.0.0-generic"
         }
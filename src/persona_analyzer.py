@@ -1,6 +1,23 @@
 import re
 from typing import Dict, Any, List
 
+_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
+    'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can', 'may',
+    'might', 'must', 'a', 'an', 'this', 'that', 'these', 'those', 'from'
+})
+
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+_VERB_ENDINGS = ('ate', 'ize', 'ify', 'ise', 'e', 'y')
+
+_ACTION_PATTERNS = [
+    re.compile(r'\b(\w+)\s+(?:a|an|the|some|many|all)\s+\w+'),
+    re.compile(r'\b(\w+)\s+\w+(?:ing|ed|er|ly)\b'),
+    re.compile(r'\b(\w+)\s+(?:and|or)\s+\w+'),
+]
+
 class PersonaAnalyzer:
     def __init__(self):
         pass
@@ -8,20 +25,26 @@ class PersonaAnalyzer:
     def analyze_persona(self, persona: Dict[str, Any], job: Dict[str, Any]) -> Dict[str, Any]:
         persona_role = persona.get('role', '').strip()
         job_task = job.get('task', '').strip()
+        persona_role_lower = persona_role.lower()
+        job_task_lower = job_task.lower()
+        
+        persona_keywords = self._extract_keywords_generic(persona_role_lower)
+        job_keywords = self._extract_keywords_generic(job_task_lower)
         
-        persona_keywords = self._extract_keywords_generic(persona_role)
-        job_keywords = self._extract_keywords_generic(job_task)
+        action_words = self._extract_dynamic_actions(job_task_lower)
         
-        action_words = self._extract_dynamic_actions(job_task)
+        all_keywords = set(persona_keywords)
+        all_keywords.update(job_keywords)
+        all_keywords.update(action_words)
         
-        all_keywords = list(set(persona_keywords + job_keywords + action_words))
+        combined_query = f"{persona_role_lower} {job_task_lower}"
         
         context = {
-            'persona_role': persona_role.lower(),
-            'job_task': job_task.lower(),
-            'keywords': all_keywords,
-            'combined_query': f"{persona_role} {job_task}".lower(),
-            'query_length': len(f"{persona_role} {job_task}".split())
+            'persona_role': persona_role_lower,
+            'job_task': job_task_lower,
+            'keywords': list(all_keywords),
+            'combined_query': combined_query,
+            'query_length': len(combined_query.split())
         }
         
         return context
@@ -30,40 +53,14 @@ class PersonaAnalyzer:
         if not text:
             return []
         
-        stop_words = {
-            'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 'has', 'had',
-            'do', 'does', 'did', 'will', 'would', 'should', 'could', 'can', 'may',
-            'might', 'must', 'a', 'an', 'this', 'that', 'these', 'those', 'from'
-        }
-        
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        meaningful_words = [word for word in words if word not in stop_words]
-        
-        return list(set(meaningful_words))
+        return list({word for word in _WORD_RE.findall(text) if word not in _STOP_WORDS})
     
     def _extract_dynamic_actions(self, text: str) -> List[str]:
         if not text:
             return []
         
-        action_patterns = [
-            r'\b(\w+)\s+(?:a|an|the|some|many|all)\s+\w+',
-            r'\b(\w+)\s+\w+(?:ing|ed|er|ly)\b',
-            r'\b(\w+)\s+(?:and|or)\s+\w+',
-        ]
-        
         actions = []
-        for pattern in action_patterns:
-            matches = re.findall(pattern, text.lower())
-            actions.extend(matches)
-        
-        verb_endings = ['ate', 'ize', 'ify', 'ise']
-        filtered_actions = []
-        
-        for word in actions:
-            if (len(word) > 3 and 
-                (any(word.endswith(ending) for ending in verb_endings) or
-                 word.endswith('e') or word.endswith('y'))):
-                filtered_actions.append(word)
+        for pattern in _ACTION_PATTERNS:
+            actions.extend(pattern.findall(text))
         
-        return list(set(filtered_actions))
+        return list({word for word in actions if len(word) > 3 and word.endswith(_VERB_ENDINGS)})
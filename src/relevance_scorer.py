@@ -1,7 +1,10 @@
+import heapq
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 import re
 
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
 class RelevanceScorer:
     def __init__(self):
         pass
@@ -12,40 +15,47 @@ class RelevanceScorer:
         if not sections:
             return []
         
-        scored_sections = []
-        
         all_keywords = persona_context.get('keywords', [])
         combined_query = persona_context.get('combined_query', '')
         
-        for section in sections:
-            score = self._calculate_pure_generic_score(section, all_keywords, combined_query)
-            
-            section_with_score = section.copy()
-            section_with_score['relevance_score'] = score
-            scored_sections.append(section_with_score)
+        keyword_set = set(kw.lower() for kw in all_keywords)
+        query_words = set(_WORD_RE.findall(combined_query.lower()))
+        
+        scores = np.empty(len(sections), dtype=np.float64)
+        unique_scores = {}
         
-        scored_sections.sort(key=lambda x: x['relevance_score'], reverse=True)
+        for i, section in enumerate(sections):
+            key = (section['section_title'], section.get('content', ''))
+            if key not in unique_scores:
+                unique_scores[key] = self._calculate_pure_generic_score(section, keyword_set, query_words)
+            scores[i] = unique_scores[key]
         
-        balanced_sections = self._ensure_diversity(scored_sections)
+        documents = [section['document'] for section in sections]
         
-        for i, section in enumerate(balanced_sections):
+        balanced_sections = []
+        for i, idx in enumerate(self._ensure_diversity(scores, documents)):
+            section = sections[idx].copy()
+            section['relevance_score'] = float(scores[idx])
             section['importance_rank'] = i + 1
+            balanced_sections.append(section)
         
         return balanced_sections
     
     def _calculate_pure_generic_score(self, section: Dict[str, Any], 
-                                    keywords: List[str], 
-                                    query: str) -> float:
+                                    keyword_set: Set[str], 
+                                    query_words: Set[str]) -> float:
         
         section_text = f"{section['section_title']} {section.get('content', '')}".lower()
+        words = _WORD_RE.findall(section_text)
+        text_words = set(words)
         
-        keyword_score = self._calculate_keyword_overlap(section_text, keywords)
+        keyword_score = self._calculate_keyword_overlap(text_words, keyword_set)
         
-        query_similarity = self._calculate_word_overlap(section_text, query)
+        query_similarity = self._calculate_word_overlap(text_words, query_words)
         
         quality_score = self._calculate_text_quality(section)
         
-        richness_score = self._calculate_content_richness(section_text)
+        richness_score = self._calculate_content_richness(words, text_words)
         
         final_score = (
             0.40 * keyword_score +
@@ -56,39 +66,28 @@ class RelevanceScorer:
         
         return final_score
     
-    def _calculate_keyword_overlap(self, text: str, keywords: List[str]) -> float:
-        if not keywords or not text:
+    def _calculate_keyword_overlap(self, text_words: Set[str], keyword_set: Set[str]) -> float:
+        if not keyword_set or not text_words:
             return 0.0
         
-        text_words = set(re.findall(r'\b[a-zA-Z]{3,}\b', text.lower()))
-        keyword_set = set(kw.lower() for kw in keywords)
-        
         direct_matches = len(text_words.intersection(keyword_set))
         
-        partial_matches = 0
-        for keyword in keyword_set:
-            if any(keyword in word for word in text_words):
-                partial_matches += 1
+        joined_words = ' '.join(text_words)
+        partial_matches = sum(1 for keyword in keyword_set if keyword in joined_words)
         
         total_keywords = len(keyword_set)
         overlap_score = (direct_matches * 2 + partial_matches) / (total_keywords * 2)
         
         return min(1.0, overlap_score)
     
-    def _calculate_word_overlap(self, text1: str, text2: str) -> float:
-        if not text1 or not text2:
-            return 0.0
-        
-        words1 = set(re.findall(r'\b[a-zA-Z]{3,}\b', text1.lower()))
-        words2 = set(re.findall(r'\b[a-zA-Z]{3,}\b', text2.lower()))
-        
-        if not words1 or not words2:
+    def _calculate_word_overlap(self, text_words: Set[str], query_words: Set[str]) -> float:
+        if not text_words or not query_words:
             return 0.0
         
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
+        intersection = len(text_words & query_words)
+        union = len(text_words) + len(query_words) - intersection
         
-        return intersection / union if union > 0 else 0.0
+        return intersection / union
     
     def _calculate_text_quality(self, section: Dict[str, Any]) -> float:
         title = section.get('section_title', '')
@@ -113,12 +112,8 @@ class RelevanceScorer:
         
         return min(1.0, quality_score)
     
-    def _calculate_content_richness(self, text: str) -> float:
-        if not text:
-            return 0.0
-        
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        unique_words = len(set(words))
+    def _calculate_content_richness(self, words: List[str], text_words: Set[str]) -> float:
+        unique_words = len(text_words)
         total_words = len(words)
         
         if total_words == 0:
@@ -131,27 +126,31 @@ class RelevanceScorer:
         
         return min(1.0, richness)
     
-    def _ensure_diversity(self, ranked_sections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        if not ranked_sections:
+    def _ensure_diversity(self, scores: np.ndarray, documents: List[str]) -> List[int]:
+        if not documents:
             return []
         
-        unique_docs = list(set(section['document'] for section in ranked_sections))
-        total_needed = min(15, len(ranked_sections))
-        per_doc = max(1, total_needed // len(unique_docs))
+        score_list = scores.tolist()
+        rank_key = lambda idx: (-score_list[idx], idx)
         
-        balanced = []
-        doc_counts = {}
+        doc_indices = {}
+        for idx, doc in enumerate(documents):
+            doc_indices.setdefault(doc, []).append(idx)
+        
+        total_needed = min(15, len(documents))
+        per_doc = max(1, total_needed // len(doc_indices))
         
-        for section in ranked_sections:
-            doc = section['document']
-            if doc_counts.get(doc, 0) < per_doc:
-                balanced.append(section)
-                doc_counts[doc] = doc_counts.get(doc, 0) + 1
+        balanced = []
+        for indices in doc_indices.values():
+            balanced.extend(heapq.nsmallest(per_doc, indices, key=rank_key))
+        balanced.sort(key=rank_key)
+        selected = set(balanced)
         
-        for section in ranked_sections:
+        for idx in heapq.nsmallest(total_needed + len(balanced), range(len(documents)), key=rank_key):
             if len(balanced) >= total_needed:
                 break
-            if section not in balanced:
-                balanced.append(section)
+            if idx not in selected:
+                balanced.append(idx)
+                selected.add(idx)
         
         return balanced[:total_needed]